@@ -1,25 +1,81 @@
 import csv
+import json
 import os
 import sys
+import time
 import argparse
 import datetime as dt
 import requests as r
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from pathlib import Path
 import re
 import traceback
 import logging
+import uuid
+
+try:
+    import polars as pl
+except ImportError:
+    # Optional fast path for the CSV -> Parquet migration.
+    pl = None
+
+try:
+    import httpx
+except ImportError:
+    # Optional HTTP/2 client for the Kraken API.
+    httpx = None
 
 # Constants
 PAIRS_URL = 'https://api.kraken.com/0/public/AssetPairs'
 TIME_URL = 'https://api.kraken.com/0/public/Time'
 OHLC_URL = 'https://api.kraken.com/0/public/OHLC?pair={pair}&interval=1&since={since}'
 
+CSV_READ_OPTIONS = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+# The download format is fixed, so spell the dtypes out instead of paying
+# for type inference on every file (and risking per-file schema drift).
+CSV_COLUMN_TYPES = {
+    'time': pa.string(),
+    'open': pa.float64(),
+    'high': pa.float64(),
+    'low': pa.float64(),
+    'close': pa.float64(),
+    'vwap': pa.float64(),
+    'volume': pa.float64(),
+    'count': pa.int64(),
+    'pair': pa.string(),
+}
+CSV_CONVERT_OPTIONS = pacsv.ConvertOptions(column_types=CSV_COLUMN_TYPES)
+# The original downloader joined its header without a comma between count
+# and pair ("...volume,countpair") and left a trailing comma on every data
+# row, so legacy files carry 8 header names but 10 fields per row.
+LEGACY_CSV_HEADER = "time,open,high,low,close,vwap,volume,countpair"
+LEGACY_CSV_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'vwap', 'volume',
+                      'count', 'pair', '_trailing']
+# Concurrent OHLC requests; also caps the request rate against Kraken's API.
+DOWNLOAD_WORKERS = 16
+# The tradable-pairs list changes on the order of days; cache it for one.
+PAIRS_CACHE_TTL = 24 * 60 * 60
+RENAME_WORKERS = 8
+LOCAL_TZ = dt.datetime.now().astimezone().tzinfo
+# Fallback for trees that do not follow the .../YYYY/MM/ layout.
+YEAR_MONTH_RE = re.compile(r"(\d{4})/(\d{2})")
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 3
+
 
 def setup_logging(log_file, log_level):
     logger = logging.getLogger("kraken_pipeline")
     logger.setLevel(log_level)
 
+    # Idempotent: repeated calls must not stack duplicate handlers.
+    if logger.handlers:
+        return logger
+
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 
     file_handler = logging.FileHandler(log_file)
@@ -41,7 +97,9 @@ def ensure_dir(path):
 
 def is_valid_parquet(file_path, logger=None):
     try:
-        pd.read_parquet(file_path, engine='pyarrow')
+        # Reading the footer metadata is enough to detect corruption and
+        # avoids decompressing the whole file just to throw it away.
+        pq.ParquetFile(str(file_path)).metadata
         return True
     except Exception as e:
         if logger:
@@ -49,10 +107,53 @@ def is_valid_parquet(file_path, logger=None):
         return False
 
 
+def fetch_asset_pairs(session, base_path, logger):
+    cache_file = base_path / ".pairs_cache.json"
+    try:
+        if cache_file.exists() and time.time() - cache_file.stat().st_mtime < PAIRS_CACHE_TTL:
+            logger.debug("Using cached asset pairs from %s", cache_file)
+            with open(cache_file) as f:
+                return json.load(f)
+    except Exception as e:
+        logger.warning("Ignoring unreadable pairs cache %s: %s", cache_file, e)
+
+    logger.debug("Fetching available asset pairs from Kraken...")
+    pairs = list(session.get(PAIRS_URL).json()['result'].keys())
+
+    try:
+        tmp = cache_file.with_name(cache_file.name + ".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(pairs, f)
+        tmp.rename(cache_file)
+    except Exception as e:
+        logger.warning("Failed to write pairs cache %s: %s", cache_file, e)
+
+    return pairs
+
+
+def make_session():
+    if httpx is not None:
+        try:
+            # A single HTTP/2 connection multiplexes all pair requests,
+            # avoiding per-request TCP/TLS setup entirely.
+            return httpx.Client(http2=True, timeout=10.0,
+                                limits=httpx.Limits(max_connections=32))
+        except ImportError:
+            # httpx without the http2 extra (h2); use requests instead.
+            pass
+
+    session = r.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32)
+    session.mount('https://', adapter)
+    return session
+
+
 def download_data(base_path, logger, selected_pairs=None):
+    session = make_session()
+
     try:
         logger.debug("Fetching Kraken server time...")
-        resp = r.get(TIME_URL).json()
+        resp = session.get(TIME_URL).json()
         server_now = resp['result']['unixtime']
         start = server_now - 12 * 60 * 60
         logger.debug(f"Server time: {server_now}, Start time: {start}")
@@ -61,8 +162,7 @@ def download_data(base_path, logger, selected_pairs=None):
         return
 
     try:
-        logger.debug("Fetching available asset pairs from Kraken...")
-        pairs = r.get(PAIRS_URL).json()['result'].keys()
+        pairs = fetch_asset_pairs(session, base_path, logger)
         if selected_pairs:
             logger.debug("Filtering for selected pairs only: %s", selected_pairs)
             pairs = [p for p in pairs if p in selected_pairs]
@@ -77,85 +177,357 @@ def download_data(base_path, logger, selected_pairs=None):
     folder = base_path / year / month
     ensure_dir(folder)
 
-    for pair in pairs:
+    import pandas as pd
+
+    def fetch(pair):
         try:
             logger.debug("Requesting OHLC data for pair: %s", pair)
-            resp = r.get(OHLC_URL.format(pair=pair, since=start)).json()
+            resp = session.get(OHLC_URL.format(pair=pair, since=start)).json()
             result = resp['result'].get(pair)
             if not result:
                 logger.debug("No data returned for %s", pair)
-                continue
+                return
 
             filename = today.strftime('%Y-%m-%d-%H-%M') + f'-{pair}.csv'
             file_path = folder / filename
 
             logger.debug("Writing data to file: %s", file_path)
-            with open(file_path, 'w') as f:
-                f.write("time,open,high,low,close,vwap,volume,count,pair\n")
-                for row in result:
-                    row[0] = dt.datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M')
-                    row.append(pair)
-                    f.write(",".join(map(str, row)) + "\n")
+            arr = np.asarray(result, dtype=object)
+            # Like datetime.fromtimestamp before it, render in local time so
+            # new rows line up with the existing archive.
+            times = (pd.to_datetime(arr[:, 0].astype('int64'), unit='s', utc=True)
+                     .tz_convert(LOCAL_TZ)
+                     .strftime('%Y-%m-%d %H:%M'))
+            # Prices stay the exact strings the API returned.
+            table = pa.table({
+                'time': pa.array(times, type=pa.string()),
+                'open': pa.array(arr[:, 1], type=pa.string()),
+                'high': pa.array(arr[:, 2], type=pa.string()),
+                'low': pa.array(arr[:, 3], type=pa.string()),
+                'close': pa.array(arr[:, 4], type=pa.string()),
+                'vwap': pa.array(arr[:, 5], type=pa.string()),
+                'volume': pa.array(arr[:, 6], type=pa.string()),
+                'count': pa.array(arr[:, 7], type=pa.int64()),
+                'pair': pa.array([pair] * len(arr)),
+            })
+            pacsv.write_csv(table, str(file_path),
+                            write_options=pacsv.WriteOptions(include_header=True,
+                                                             quoting_style='none'))
         except Exception as e:
             logger.error("Failed to fetch/write data for %s: %s", pair, str(e))
 
+    # The requests are I/O-bound, so a thread pool turns N sequential
+    # round-trips into N / DOWNLOAD_WORKERS.
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        list(executor.map(fetch, pairs))
+
+
+def read_legacy_csv_table(csv_file):
+    """Parse a file in the old downloader's ragged format, or return None.
+
+    Supplying the real column names (with the fused count/pair split back
+    into two columns and the trailing empty field dropped) lets the Arrow
+    reader parse these files natively, yielding the same schema as the
+    current download format.
+    """
+    try:
+        with open(csv_file) as f:
+            header = f.readline().strip()
+        if header != LEGACY_CSV_HEADER:
+            return None
+
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=8 << 20,
+                                         column_names=LEGACY_CSV_COLUMNS, skip_rows=1)
+        convert_options = pacsv.ConvertOptions(
+            column_types=CSV_COLUMN_TYPES,
+            include_columns=[c for c in LEGACY_CSV_COLUMNS if c != '_trailing'])
+        return pacsv.read_csv(str(csv_file), read_options=read_options,
+                              convert_options=convert_options)
+    except Exception:
+        return None
+
+
+def read_csv_table(csv_file):
+    try:
+        return pacsv.read_csv(str(csv_file), read_options=CSV_READ_OPTIONS,
+                              convert_options=CSV_CONVERT_OPTIONS)
+    except pa.ArrowInvalid:
+        table = read_legacy_csv_table(csv_file)
+        if table is not None:
+            return table
+        # Not the known legacy format either; fall back to the forgiving
+        # pandas parser as a last resort.
+        import pandas as pd
+        return pa.Table.from_pandas(pd.read_csv(csv_file, low_memory=False), preserve_index=False)
+
+
+def write_parquet_table(table, parquet_file, sorting_columns=None):
+    # compression_level is only meaningful for codecs with tunable levels.
+    level = PARQUET_COMPRESSION_LEVEL if PARQUET_COMPRESSION in ('zstd', 'gzip', 'brotli') else None
+    pq.write_table(
+        table,
+        str(parquet_file),
+        compression=PARQUET_COMPRESSION,
+        compression_level=level,
+        use_dictionary=True,
+        write_statistics=True,
+        sorting_columns=sorting_columns,
+    )
+
+
+def write_fragment_polars(files, fragment):
+    """Stream a group of CSVs straight into a Parquet fragment with polars.
+
+    The lazy scan parses and writes in streaming chunks, so the group never
+    has to be materialized in memory. Returns False when polars is not
+    installed or any file in the group cannot be parsed strictly; the
+    caller then falls back to the per-file pyarrow path.
+    """
+    if pl is None:
+        return False
+    try:
+        level = PARQUET_COMPRESSION_LEVEL if PARQUET_COMPRESSION == 'zstd' else None
+        overrides = {
+            'time': pl.String,
+            'open': pl.Float64,
+            'high': pl.Float64,
+            'low': pl.Float64,
+            'close': pl.Float64,
+            'vwap': pl.Float64,
+            'volume': pl.Float64,
+            'count': pl.Int64,
+            'pair': pl.String,
+        }
+        lf = pl.scan_csv([str(f) for f in files], schema_overrides=overrides)
+        lf.sink_parquet(str(fragment), compression=PARQUET_COMPRESSION, compression_level=level)
+        return True
+    except Exception:
+        if fragment.exists():
+            fragment.unlink()
+        return False
+
+
+def write_fragment_streaming(files, fragment, logger=None):
+    """Stream a group of CSVs into a Parquet fragment one batch at a time.
+
+    Peak memory stays at one CSV block instead of the whole group. Returns
+    False when the group mixes schemas or a file fails strict parsing; the
+    caller then falls back to the materializing per-file path.
+    """
+    writer = None
+    schema = None
+    try:
+        for csv_file in files:
+            with pacsv.open_csv(str(csv_file), read_options=CSV_READ_OPTIONS,
+                                convert_options=CSV_CONVERT_OPTIONS) as reader:
+                if writer is None:
+                    schema = reader.schema
+                    level = PARQUET_COMPRESSION_LEVEL if PARQUET_COMPRESSION in ('zstd', 'gzip', 'brotli') else None
+                    writer = pq.ParquetWriter(str(fragment), schema,
+                                              compression=PARQUET_COMPRESSION,
+                                              compression_level=level,
+                                              use_dictionary=True)
+                elif reader.schema != schema:
+                    raise pa.ArrowInvalid(f"schema mismatch in {csv_file}")
+                for batch in reader:
+                    writer.write_batch(batch)
+        writer.close()
+        return True
+    except Exception as e:
+        if logger:
+            logger.debug("Streaming fragment write failed for %s: %s", fragment, e)
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        if fragment.exists():
+            fragment.unlink()
+        return False
+
+
+def drop_duplicate_rows(table):
+    names = table.column_names
+    if "time" in names and "pair" in names:
+        # Native hash-aggregation kernel; keeps the first row per key like
+        # the pandas drop_duplicates it replaces (use_threads=False makes
+        # "first" follow input order).
+        value_cols = [c for c in names if c not in ("time", "pair")]
+        grouped = table.group_by(["time", "pair"], use_threads=False).aggregate(
+            [(c, "first") for c in value_cols])
+        renames = {f"{c}_first": c for c in value_cols}
+        grouped = grouped.rename_columns([renames.get(c, c) for c in grouped.column_names])
+        return grouped.select(names)
+
+    # No (time, pair) key to dedupe on; fall back to full-row dedupe.
+    df = table.to_pandas().drop_duplicates(ignore_index=True)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def mark_processed(csv_file, delete_csv, logger):
+    copied = csv_file.with_suffix(csv_file.suffix + ".copied")
+    logger.debug("Renaming CSV to: %s", copied)
+    csv_file.rename(copied)
+
+    if delete_csv:
+        logger.debug("Deleting copied CSV file: %s", copied)
+        copied.unlink()
+
 
 def process_csvs(input_path, parquet_path, delete_csv, logger):
     all_csvs = list(input_path.rglob("*.csv"))
     logger.debug("Found %d CSV files to process", len(all_csvs))
+
+    # Group files by (year, month) so each monthly Parquet is read and
+    # rewritten once per run instead of once per CSV file.
+    groups = {}
     for csv_file in all_csvs:
         if csv_file.name.endswith(".copied"):
             continue
 
-        try:
-            match = re.search(r"(\d{4})/(\d{2})", str(csv_file.parent))
+        # The tree layout is .../YYYY/MM/file.csv, so the path parts already
+        # hold year and month; only odd layouts need the regex.
+        month = csv_file.parent.name
+        year = csv_file.parent.parent.name
+        if not (len(year) == 4 and year.isdigit() and len(month) == 2 and month.isdigit()):
+            match = YEAR_MONTH_RE.search(str(csv_file.parent))
             if not match:
                 continue
             year, month = match.group(1), match.group(2)
-            parquet_file = parquet_path / year / month / f"{year}-{month}.parquet"
-            ensure_dir(parquet_file.parent)
 
-            if csv_file.stat().st_size == 0:
-                logger.warning("Skipping empty file: %s", csv_file)
-                continue
+        if csv_file.stat().st_size == 0:
+            logger.warning("Skipping empty file: %s", csv_file)
+            continue
 
-            logger.debug("Reading CSV file: %s", csv_file)
-            df_new = pd.read_csv(csv_file, low_memory=False)
+        groups.setdefault((year, month), []).append(csv_file)
 
-            if parquet_file.exists():
-                if not is_valid_parquet(parquet_file, logger):
-                    logger.warning("Deleting corrupted Parquet file: %s", parquet_file)
-                    parquet_file.unlink()
-                else:
-                    df_old = pd.read_parquet(parquet_file)
-                    df_new = pd.concat([df_old, df_new], ignore_index=True)
+    for (year, month), files in sorted(groups.items()):
+        month_dir = parquet_path / year / month
+        ensure_dir(month_dir)
+        fragment = month_dir / f"{year}-{month}-{uuid.uuid4().hex}.parquet"
 
-            logger.debug("Writing combined DataFrame to Parquet: %s", parquet_file)
-            df_new.to_parquet(parquet_file, index=False, compression="gzip")
+        if write_fragment_polars(files, fragment) or write_fragment_streaming(files, fragment, logger):
+            logger.debug("Streamed Parquet fragment: %s", fragment)
+            for csv_file in files:
+                mark_processed(csv_file, delete_csv, logger)
+            continue
 
-            copied = csv_file.with_suffix(csv_file.suffix + ".copied")
-            logger.debug("Renaming CSV to: %s", copied)
-            csv_file.rename(copied)
+        tables = []
+        read_files = []
+        for csv_file in files:
+            try:
+                logger.debug("Reading CSV file: %s", csv_file)
+                tables.append(read_csv_table(csv_file))
+                read_files.append(csv_file)
+            except Exception as e:
+                logger.error("Error processing %s:\n%s", csv_file, traceback.format_exc())
+
+        if not tables:
+            continue
 
-            if delete_csv:
-                logger.debug("Deleting copied CSV file: %s", copied)
-                copied.unlink()
+        try:
+            combined = pa.concat_tables(tables, promote_options="permissive")
+            logger.debug("Appending Parquet fragment: %s", fragment)
+            write_parquet_table(combined, fragment)
+        except Exception as e:
+            logger.error("Error writing fragment for %s/%s:\n%s", year, month, traceback.format_exc())
+            continue
+
+        for csv_file in read_files:
+            mark_processed(csv_file, delete_csv, logger)
+
+
+def compact_parquet(parquet_path, logger):
+    """Merge the Parquet fragments of each month into a single deduplicated file.
+
+    Appends only ever add new fragment files, so run this periodically
+    (e.g. nightly) to keep the number of files per month bounded.
+    """
+    for month_dir in sorted(p for p in parquet_path.glob("*/*") if p.is_dir()):
+        fragments = sorted(month_dir.glob("*.parquet"))
+        year, month = month_dir.parent.name, month_dir.name
+        target = month_dir / f"{year}-{month}.parquet"
+
+        # Only skip a month whose sole file is already the compacted target;
+        # a single uuid-suffixed fragment still needs the dedupe and sort.
+        if not fragments or fragments == [target]:
+            continue
+
+        tables = []
+        merged = []
+        for fragment in fragments:
+            if not is_valid_parquet(fragment, logger):
+                logger.warning("Skipping invalid Parquet fragment: %s", fragment)
+                continue
+            try:
+                # pre_buffer coalesces column-chunk reads into few large
+                # requests; matters most on network file systems.
+                tables.append(pq.read_table(str(fragment), use_threads=True, pre_buffer=True))
+                merged.append(fragment)
+            except Exception as e:
+                logger.warning("Skipping unreadable Parquet fragment %s: %s", fragment, e)
+
+        if not tables:
+            continue
+
+        try:
+            combined = drop_duplicate_rows(pa.concat_tables(tables, promote_options="permissive"))
+
+            # Sort the consolidated file by (pair, time): the low-cardinality
+            # pair column dictionary-encodes into long runs and readers that
+            # filter on pair can skip row groups via the recorded statistics.
+            names = combined.column_names
+            sorting_columns = None
+            if "pair" in names and "time" in names:
+                combined = combined.sort_by([("pair", "ascending"), ("time", "ascending")])
+                sorting_columns = [pq.SortingColumn(names.index("pair")),
+                                   pq.SortingColumn(names.index("time"))]
+
+            tmp = target.with_suffix(".parquet.tmp")
+            write_parquet_table(combined, tmp, sorting_columns=sorting_columns)
+
+            # Rename first: it atomically replaces the old compacted file,
+            # so a crash while unlinking at worst leaves duplicate fragments
+            # that the next compact run dedupes — never data only in a .tmp.
+            tmp.rename(target)
+            for fragment in merged:
+                if fragment != target:
+                    fragment.unlink()
+            logger.info("Compacted %d fragments into %s", len(fragments), target)
         except Exception as e:
-            logger.error("Error processing %s:\n%s", csv_file, traceback.format_exc())
+            logger.error("Failed to compact %s: %s", month_dir, e)
+
+
+def iter_files_with_suffix(root, suffix):
+    # Raw os.scandir walk: no per-entry Path objects and no extra stat
+    # calls, which rglob pays for on large archives.
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_files_with_suffix(entry.path, suffix)
+        elif entry.name.endswith(suffix):
+            yield entry.path
 
 
 def restore_copied(input_path, logger):
-    count = 0
-    for f in input_path.rglob("*.csv.copied"):
-        original = f.with_suffix(".csv")
-        f.rename(original)
-        count += 1
-    logger.info("Restored %d files.", count)
+    paths = list(iter_files_with_suffix(str(input_path), ".csv.copied"))
+
+    def restore(path):
+        os.rename(path, path[:-len(".copied")])
+
+    # os.rename releases the GIL, so the renames parallelize well.
+    with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as executor:
+        list(executor.map(restore, paths))
+
+    logger.info("Restored %d files.", len(paths))
 
 
 def migrate_existing(input_path, output_path, logger, delete_csv=False, mark_errors=False):
     all_csvs = list(input_path.rglob("*.csv"))
     logger.debug("Found %d CSV files to migrate", len(all_csvs))
+
+    # Group files by (year, month) first so each monthly Parquet is read
+    # and rewritten once per run instead of once per CSV file.
+    groups = {}
     for csv_file in all_csvs:
         try:
             year = csv_file.parents[1].name
@@ -164,29 +536,59 @@ def migrate_existing(input_path, output_path, logger, delete_csv=False, mark_err
             logger.error("Path structure too short: %s", csv_file)
             continue
 
-        parquet_file = output_path / year / month / f"{year}-{month}.parquet"
-        ensure_dir(parquet_file.parent)
+        groups.setdefault((year, month), []).append(csv_file)
+
+    for (year, month), files in sorted(groups.items()):
+        month_dir = output_path / year / month
+        ensure_dir(month_dir)
+        fragment = month_dir / f"{year}-{month}-{uuid.uuid4().hex}.parquet"
+
+        non_empty = [f for f in files if f.stat().st_size > 0]
+        if non_empty == files and (write_fragment_polars(files, fragment)
+                                   or write_fragment_streaming(files, fragment, logger)):
+            logger.debug("Streamed migrated Parquet fragment: %s", fragment)
+            for csv_file in files:
+                copied = csv_file.with_suffix(csv_file.suffix + ".copied")
+                logger.debug("Renaming migrated CSV to: %s", copied)
+                csv_file.rename(copied)
+                if delete_csv:
+                    logger.debug("Deleting copied CSV file: %s", copied)
+                    copied.unlink()
+            continue
 
-        try:
+        tables = []
+        read_files = []
+        for csv_file in files:
             if csv_file.stat().st_size == 0:
-                raise pd.errors.EmptyDataError("File is empty")
-
-            df = pd.read_csv(csv_file, low_memory=True)
+                logger.warning("Empty CSV skipped: %s", csv_file)
+                if mark_errors:
+                    error_file = csv_file.with_suffix(csv_file.suffix + ".error")
+                    csv_file.rename(error_file)
+                    logger.error("Marked file as error: %s", error_file)
+                continue
 
-            if parquet_file.exists():
-                if not is_valid_parquet(parquet_file, logger):
-                    logger.warning("Deleting invalid Parquet file: %s", parquet_file)
-                    parquet_file.unlink()
-                    df_combined = df
-                else:
-                    df_old = pd.read_parquet(parquet_file)
-                    df_combined = pd.concat([df_old, df], ignore_index=True)
-            else:
-                df_combined = df
+            try:
+                tables.append(read_csv_table(csv_file))
+                read_files.append(csv_file)
+            except Exception as e:
+                logger.error("Failed to migrate %s: %s", csv_file, e)
+                if mark_errors:
+                    error_file = csv_file.with_suffix(csv_file.suffix + ".error")
+                    csv_file.rename(error_file)
+                    logger.error("Marked file as error: %s", error_file)
+
+        if not tables:
+            continue
 
-            logger.debug("Writing migrated Parquet: %s", parquet_file)
-            df_combined.to_parquet(parquet_file, index=False, compression="gzip")
+        try:
+            combined = pa.concat_tables(tables, promote_options="permissive")
+            logger.debug("Appending migrated Parquet fragment: %s", fragment)
+            write_parquet_table(combined, fragment)
+        except Exception as e:
+            logger.error("Failed to write fragment for %s/%s: %s", year, month, e)
+            continue
 
+        for csv_file in read_files:
             copied = csv_file.with_suffix(csv_file.suffix + ".copied")
             logger.debug("Renaming migrated CSV to: %s", copied)
             csv_file.rename(copied)
@@ -195,33 +597,37 @@ def migrate_existing(input_path, output_path, logger, delete_csv=False, mark_err
                 logger.debug("Deleting copied CSV file: %s", copied)
                 copied.unlink()
 
-        except pd.errors.EmptyDataError:
-            logger.warning("Empty CSV skipped: %s", csv_file)
-            if mark_errors:
-                error_file = csv_file.with_suffix(csv_file.suffix + ".error")
-                csv_file.rename(error_file)
-                logger.error("Marked file as error: %s", error_file)
-        except Exception as e:
-            logger.error("Failed to migrate %s: %s", csv_file, e)
-            if mark_errors:
-                error_file = csv_file.with_suffix(csv_file.suffix + ".error")
-                csv_file.rename(error_file)
-                logger.error("Marked file as error: %s", error_file)
-
 
 def main():
+    global PARQUET_COMPRESSION
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--input", "-i", type=str, required=True, help="Input data root folder")
+    common.add_argument("--output", "-o", type=str, default="parquet-data", help="Parquet output folder")
+    common.add_argument("--compression", type=str, default=PARQUET_COMPRESSION, choices=["zstd", "snappy", "gzip"],
+                        help="Parquet compression codec (default: zstd)")
+    common.add_argument("--log-level", type=str, default="INFO", help="Logging level: DEBUG, INFO, WARNING, ERROR, CRITICAL")
+
     parser = argparse.ArgumentParser(description="Kraken CSV Downloader and Parquet Archiver")
-    parser.add_argument("--input", "-i", type=str, required=True, help="Input data root folder")
-    parser.add_argument("--output", "-o", type=str, default="parquet-data", help="Parquet output folder")
-    parser.add_argument("--restore", action="store_true", help="Restore .csv.copied files to .csv")
-    parser.add_argument("--migrate", action="store_true", help="Migrate all existing archive to parquet")
-    parser.add_argument("--delete-csv", action="store_true", help="Delete .csv.copied files after archiving")
-    parser.add_argument("--download", action="store_true", help="Download new Kraken data before processing")
-    parser.add_argument("--pairs", nargs='+', help="List of asset pairs to download (e.g., XETHZEUR XXBTZUSD)")
-    parser.add_argument("--log-level", type=str, default="INFO", help="Logging level: DEBUG, INFO, WARNING, ERROR, CRITICAL")
-    parser.add_argument("--mark-errors", action="store_true", help="Rename failed .csv files to .error instead of .copied")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_download = sub.add_parser("download", parents=[common], help="Download new Kraken OHLC data as CSVs")
+    p_download.add_argument("--pairs", nargs='+', help="List of asset pairs to download (e.g., XETHZEUR XXBTZUSD)")
+
+    p_process = sub.add_parser("process", parents=[common], help="Convert pending CSVs to Parquet fragments")
+    p_process.add_argument("--delete-csv", action="store_true", help="Delete .csv.copied files after archiving")
+
+    p_migrate = sub.add_parser("migrate", parents=[common], help="Migrate an existing CSV archive to Parquet")
+    p_migrate.add_argument("--delete-csv", action="store_true", help="Delete .csv.copied files after archiving")
+    p_migrate.add_argument("--mark-errors", action="store_true", help="Rename failed .csv files to .error instead of .copied")
+
+    sub.add_parser("restore", parents=[common], help="Restore .csv.copied files to .csv")
+    sub.add_parser("compact", parents=[common], help="Merge monthly Parquet fragments into one file per month")
+
     args = parser.parse_args()
 
+    PARQUET_COMPRESSION = args.compression
+
     input_path = Path(args.input)
     output_path = Path(args.output)
     # create logging file and folder
@@ -230,17 +636,18 @@ def main():
     log_level = getattr(logging, args.log_level.upper(), logging.INFO)
     logger = setup_logging(log_file, log_level)
 
-    if args.download:
+    if args.command == "download":
         download_data(input_path, logger, selected_pairs=args.pairs)
-
-    if args.migrate:
+    elif args.command == "process":
+        process_csvs(input_path, output_path, args.delete_csv, logger)
+    elif args.command == "migrate":
         migrate_existing(input_path, output_path, logger, delete_csv=args.delete_csv, mark_errors=args.mark_errors)
-
-    if args.restore:
+    elif args.command == "restore":
         restore_copied(input_path, logger)
+    elif args.command == "compact":
+        compact_parquet(output_path, logger)
 
-    process_csvs(input_path, output_path, args.delete_csv, logger)
-    logger.info("✅ All tasks done.")
+    logger.info("✅ %s done.", args.command)
 
 
 if __name__ == "__main__":
@@ -14,13 +14,22 @@ source "$VENV_PATH/bin/activate"
 # Move to project directory
 cd "$PROJECT_DIR" || exit 1
 
-# Run pipeline: download, process, log everything
-python "$PYTHON_SCRIPT" \
+# Run pipeline: download, process, compact, log everything
+python "$PYTHON_SCRIPT" download \
+    --input "$PROJECT_DIR" \
+    --output "$PROJECT_DIR/parquet-data" \
+    --log-level INFO
+
+python "$PYTHON_SCRIPT" process \
+    --input "$PROJECT_DIR" \
+    --output "$PROJECT_DIR/parquet-data" \
+    --log-level INFO \
+    --delete-csv
+
+python "$PYTHON_SCRIPT" compact \
     --input "$PROJECT_DIR" \
     --output "$PROJECT_DIR/parquet-data" \
-    --download \
     --log-level INFO
-    --delete
 
 # Done
 echo "✅ Kraken pipeline finished successfully at $(date)"